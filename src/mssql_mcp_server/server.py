@@ -1,7 +1,17 @@
 import asyncio
+import csv
+import functools
+import io
 import logging
 import os
-from pyodbc import connect, Error
+import re
+import time
+import aioodbc
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from types import MappingProxyType
+from urllib.parse import urlsplit
+from pyodbc import Error
 from mcp.server import Server
 from mcp.types import Resource, Tool, TextContent
 from pydantic import AnyUrl
@@ -13,39 +23,47 @@ logging.basicConfig(
 )
 logger = logging.getLogger("mssql_mcp_server")
 
+def _clean_env_var(env_var, default=None):
+    """Read an environment variable, stripping one pair of surrounding quotes.
+
+    A single length check and two character compares instead of the four
+    startswith/endswith calls the old helper made per variable.
+    """
+    value = os.getenv(env_var, default)
+    if value and len(value) >= 2 and value[0] == value[-1] and value[0] in ("'", '"'):
+        value = value[1:-1]
+    return value
+
+@functools.lru_cache(maxsize=1)
 def get_db_config():
-    """Get database configuration from environment variables."""
-    logger.info("Reading database configuration from environment variables...")
-    
-    # Helper function to clean environment variables (remove surrounding quotes)
-    def clean_env_var(env_var, default=None):
-        value = os.getenv(env_var, default)
-        if value and isinstance(value, str):
-            # Remove surrounding single or double quotes if present
-            if (value.startswith("'") and value.endswith("'")) or (value.startswith('"') and value.endswith('"')):
-                value = value[1:-1]
-        return value
-    
-    driver = clean_env_var("MSSQL_DRIVER", "ODBC Driver 18 for SQL Server")
-    server = clean_env_var("MSSQL_HOST", "localhost")
-    port = clean_env_var("MSSQL_PORT", "1433")
-    user = clean_env_var("MSSQL_USER")
-    password = clean_env_var("MSSQL_PASSWORD")
-    database = clean_env_var("MSSQL_DATABASE")
+    """Get database configuration from environment variables.
+
+    The environment does not change for the lifetime of the process, so the
+    result is computed (and logged) once and served from cache afterwards.
+    """
+    logger.debug("Reading database configuration from environment variables...")
+
+    driver = _clean_env_var("MSSQL_DRIVER", "ODBC Driver 18 for SQL Server")
+    server = _clean_env_var("MSSQL_HOST", "localhost")
+    port = _clean_env_var("MSSQL_PORT", "1433")
+    user = _clean_env_var("MSSQL_USER")
+    password = _clean_env_var("MSSQL_PASSWORD")
+    database = _clean_env_var("MSSQL_DATABASE")
     
     # 비밀번호가 올바르게 전달되었는지 확인하기 위한 디버깅 로그 (일부만 표시)
-    if password and len(password) > 4:
-        # 비밀번호의 일부만 출력 (보안상 전체 표시는 안 함)
-        password_hint = f"{password[:2]}...{password[-2:]}"
-        special_chars = ''.join([c for c in password if not c.isalnum()])
-        logger.info(f"Debug - Password format: begins with '{password[:2]}', ends with '{password[-2:]}', contains special chars: '{special_chars}'")
-    else:
-        logger.warning("Password is too short or not provided!")
-    
-    # 자세한 로깅을 추가하여 실제로 어떤 값들이 설정되었는지 볼 수 있습니다
-    logger.info(f"Using driver: {driver}")
-    logger.info(f"Connecting to server: {server}:{port}")
-    logger.info(f"Database: {database}, User: {user}")
+    # The per-character password scan only runs when DEBUG is actually on
+    if logger.isEnabledFor(logging.DEBUG):
+        if password and len(password) > 4:
+            # 비밀번호의 일부만 출력 (보안상 전체 표시는 안 함)
+            special_chars = ''.join([c for c in password if not c.isalnum()])
+            logger.debug("Debug - Password format: begins with '%s', ends with '%s', contains special chars: '%s'", password[:2], password[-2:], special_chars)
+        elif not password:
+            logger.debug("Password is not provided!")
+
+        # 자세한 로깅을 추가하여 실제로 어떤 값들이 설정되었는지 볼 수 있습니다
+        logger.debug("Using driver: %s", driver)
+        logger.debug("Connecting to server: %s:%s", server, port)
+        logger.debug("Database: %s, User: %s", database, user)
     
     if not all([user, password, database]):
         logger.error("Missing required database configuration. Please check environment variables:")
@@ -54,71 +72,257 @@ def get_db_config():
 
     # MSSQL에 맞는 ODBC 연결 문자열 설정
     # DSN 대신 Driver={}; 형식으로 직접 설정
-    connection_params = []
-    
-    # 기본 연결 정보
-    connection_params.append(f"Driver={{{driver}}}")
-    connection_params.append(f"Server={server},{port}")
-    connection_params.append(f"Database={database}")
-    connection_params.append(f"UID={user}")
-    connection_params.append(f"PWD={password}")
-    
-    # 고급 옵션 (기본값 제공)
-    connection_params.append(f"TrustServerCertificate={os.getenv('TrustServerCertificate', 'yes')}")
-    connection_params.append(f"Encrypt={os.getenv('Encrypt', 'yes')}")
-    connection_params.append(f"Connection Timeout={os.getenv('ConnectionTimeout', '60')}")
-    connection_params.append(f"Login Timeout={os.getenv('LoginTimeout', '60')}")
-    
-    # 특별한 MS SQL Server ODBC 관련 설정
-    # MARS(Multiple Active Result Sets) 활성화
-    connection_params.append("MARS_Connection=yes")
-    
-    # 연결 문자열 생성
-    connection_string = ";".join(connection_params)
-    
-    logger.info(f"Connection string format: Driver={{...}};Server=...;Database=...;UID=...;PWD=***;...")
-    
-    config = {
+    # str.join over a fixed-size tuple; MARS(Multiple Active Result Sets)를
+    # 활성화합니다
+    connection_string = ";".join((
+        f"Driver={{{driver}}}",
+        f"Server={server},{port}",
+        f"Database={database}",
+        f"UID={user}",
+        f"PWD={password}",
+        f"TrustServerCertificate={os.getenv('TrustServerCertificate', 'yes')}",
+        f"Encrypt={os.getenv('Encrypt', 'yes')}",
+        f"Connection Timeout={os.getenv('ConnectionTimeout', '60')}",
+        f"Login Timeout={os.getenv('LoginTimeout', '60')}",
+        "MARS_Connection=yes"
+    ))
+
+    logger.debug("Connection string format: Driver={...};Server=...;Database=...;UID=...;PWD=***;...")
+
+    # 읽기 전용 뷰로 반환하여 호출자가 설정을 변경할 수 없도록 합니다
+    config = MappingProxyType({
         "driver": driver,
         "server": f"{server}:{port}",
         "user": user,
         "database": database,
         "password": "********"  # 로그에 비밀번호 노출 방지
-    }
-    
+    })
+
     return config, connection_string
 
+# Cached configuration, populated once by init_config()
+_CONFIG: MappingProxyType | None = None
+_CONN_STR: str | None = None
+
+def init_config():
+    """Populate the module-level config globals, raising on missing settings.
+
+    main() calls this once before the server starts so misconfiguration
+    surfaces at boot; handlers fall back to it lazily when they run without
+    main() (e.g. in tests), after which they read the globals directly.
+    """
+    global _CONFIG, _CONN_STR
+    if _CONN_STR is None:
+        _CONFIG, _CONN_STR = get_db_config()
+    return _CONFIG, _CONN_STR
+
+# Connection pool settings
+POOL_MIN_SIZE = 2
+POOL_MAX_SIZE = 20
+
+# Process-wide connection pool, created once and shared by all handlers
+_pool: aioodbc.Pool | None = None
+_pool_lock = asyncio.Lock()
+_pool_executor: ThreadPoolExecutor | None = None
+
+async def get_pool() -> aioodbc.Pool:
+    """Return the shared connection pool, creating it on first use.
+
+    Checking out a pooled connection costs microseconds versus the full
+    TCP + TLS + login handshake paid by a fresh pyodbc.connect() call.
+    Blocking pyodbc calls run on a dedicated thread pool bounded to the
+    connection-pool size, so the event loop stays free while queries run.
+    """
+    global _pool, _pool_executor
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _, connection_string = init_config()
+                logger.info("Creating connection pool (min=%d, max=%d)", POOL_MIN_SIZE, POOL_MAX_SIZE)
+                _pool_executor = ThreadPoolExecutor(
+                    max_workers=POOL_MAX_SIZE,
+                    thread_name_prefix="mssql-odbc"
+                )
+                _pool = await aioodbc.create_pool(
+                    dsn=connection_string,
+                    minsize=POOL_MIN_SIZE,
+                    maxsize=POOL_MAX_SIZE,
+                    autocommit=False,
+                    executor=_pool_executor
+                )
+    return _pool
+
+async def close_pool():
+    """Close the shared pool and wait for in-flight connections to finish."""
+    global _pool, _pool_executor
+    if _pool is not None:
+        _pool.close()
+        await _pool.wait_closed()
+        _pool = None
+    if _pool_executor is not None:
+        _pool_executor.shutdown(wait=False)
+        _pool_executor = None
+
+# Number of rows fetched from the driver per round trip when formatting
+# result sets
+FETCH_CHUNK_SIZE = 1000
+
+# SQLSTATEs for dropped or stale connections and deadlock victims; these
+# are worth one retry on a fresh connection
+_TRANSIENT_SQLSTATES = frozenset({"08S01", "08001", "HYT00", "HYT01", "40001"})
+
+def _is_transient(error: Error) -> bool:
+    """Return True if the pyodbc error looks like a transient connection failure."""
+    return bool(error.args) and error.args[0] in _TRANSIENT_SQLSTATES
+
+@asynccontextmanager
+async def _db_cursor():
+    """Yield a pooled (connection, cursor) pair, released even on error.
+
+    Single choke-point for connection checkout, so every handler gets the
+    same arraysize tuning and the connection always returns to the pool.
+    A connection that failed with a transient error is closed instead of
+    being handed back for reuse.
+    """
+    pool = await get_pool()
+    conn = await pool.acquire()
+    try:
+        async with conn.cursor() as cursor:
+            # Fetch in driver-level batches; fetchmany(cursor.arraysize)
+            # is the preferred fetch unit
+            cursor.arraysize = FETCH_CHUNK_SIZE
+            yield conn, cursor
+    except Error as e:
+        if _is_transient(e):
+            # Drop the dead connection so the pool replaces it
+            await conn.close()
+        raise
+    finally:
+        await pool.release(conn)
+
+async def _with_db_retry(operation):
+    """Run operation(conn, cursor) on a pooled connection.
+
+    If the first attempt fails with a transient connection error, the dead
+    connection is discarded and the operation retried once on a fresh one.
+    """
+    try:
+        async with _db_cursor() as (conn, cursor):
+            return await operation(conn, cursor)
+    except Error as e:
+        if not _is_transient(e):
+            raise
+        logger.warning("Transient database error %s, retrying on a fresh connection", e.args[0])
+        async with _db_cursor() as (conn, cursor):
+            return await operation(conn, cursor)
+
+# Valid unquoted SQL Server identifier; anything else is rejected before
+# the table name is interpolated into a query
+_TABLE_NAME_RE = re.compile(r"^[A-Za-z_]\w*$")
+
+# Matches the leading keyword of a query in one scan, so dispatch does not
+# need to upper-case the whole query string
+_LEADING_KW = re.compile(r"\s*(SELECT|SHOW\s+TABLES|WITH)\b", re.IGNORECASE)
+
+# How long (seconds) the table catalog from INFORMATION_SCHEMA is cached;
+# catalogs change rarely, so repeated list_resources calls reuse the result
+CATALOG_TTL = float(os.getenv("MSSQL_CATALOG_TTL", "30"))
+_tables_cache: tuple[float, list[Resource]] | None = None
+_tables_cache_lock = asyncio.Lock()
+
+async def format_rows(cursor, columns, chunk_size=FETCH_CHUNK_SIZE):
+    """Format a result set as CSV text, fetching in chunks.
+
+    Fetching with fetchmany() instead of fetchall() avoids materializing
+    the whole result twice (driver rows plus formatted strings), keeping
+    peak memory bounded by the chunk size. The csv writer serializes rows
+    in C and quotes cells containing commas, quotes, or newlines, which
+    the previous str-join formatting silently corrupted.
+    """
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(columns)
+    while True:
+        batch = await cursor.fetchmany(chunk_size)
+        if not batch:
+            break
+        writer.writerows(batch)
+    return buf.getvalue().removesuffix("\n")
+
+# The tool list never changes, so the Tool object and its schema dict are
+# built once at import time; prebound formatters for the per-call messages
+_TOOLS = [
+    Tool(
+        name="execute_sql",
+        description="Execute an SQL query on the MSSQL server",
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "query": {
+                    "type": "string",
+                    "description": "The SQL query to execute"
+                }
+            },
+            "required": ["query"]
+        }
+    )
+]
+_OK_FMT = "Query executed successfully. Rows affected: {}".format
+_ERR_FMT = "Error executing query: {}".format
+
 # Initialize server
 app = Server("mssql_mcp_server")
 
 @app.list_resources()
 async def list_resources() -> list[Resource]:
-    """List MSSQL tables as resources."""
-    config, connection_string = get_db_config()
+    """List MSSQL tables as resources.
+
+    The catalog is cached for CATALOG_TTL seconds; concurrent refreshes
+    are coalesced behind a lock so only one catalog query runs at a time.
+    """
+    global _tables_cache
+
+    cached = _tables_cache
+    if cached is not None and time.monotonic() - cached[0] < CATALOG_TTL:
+        return cached[1]
+
+    async with _tables_cache_lock:
+        # Another coroutine may have refreshed the cache while we waited
+        cached = _tables_cache
+        if cached is not None and time.monotonic() - cached[0] < CATALOG_TTL:
+            return cached[1]
+        return await _query_table_resources()
+
+async def _fetch_table_resources(conn, cursor) -> list[Resource]:
+    """Build the Resource list from INFORMATION_SCHEMA on an open cursor."""
+    # SQL Server INFORMATION_SCHEMA 쿼리를 사용하여 테이블 목록 조회
+    await cursor.execute("SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_TYPE = 'BASE TABLE';")
+    # Single-column result: unpack each row directly instead of indexing
+    # into it, in one list comprehension. model_construct skips pydantic's
+    # per-field validation pipeline, which is safe because every field here
+    # is built from our own catalog query
+    return [
+        Resource.model_construct(
+            uri=AnyUrl(f"mssql://{name}/data"),
+            name=f"Table: {name}",
+            mimeType="text/plain",
+            description=f"Data in table: {name}"
+        )
+        for (name,) in await cursor.fetchall()
+    ]
+
+async def _query_table_resources() -> list[Resource]:
+    """Query INFORMATION_SCHEMA for tables and repopulate the cache."""
+    global _tables_cache
     try:
-        logger.info("Attempting to connect to database to list resources...")
-        with connect(connection_string) as conn:
-            logger.info("Database connection established successfully")
-            with conn.cursor() as cursor:
-                # SQL Server INFORMATION_SCHEMA 쿼리를 사용하여 테이블 목록 조회
-                cursor.execute("SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_TYPE = 'BASE TABLE';")
-                tables = cursor.fetchall()
-                logger.info(f"Found {len(tables)} tables")
-                
-                resources = []
-                for table in tables:
-                    resources.append(
-                        Resource(
-                            uri=f"mssql://{table[0]}/data",
-                            name=f"Table: {table[0]}",
-                            mimeType="text/plain",
-                            description=f"Data in table: {table[0]}"
-                        )
-                    )
-                return resources
+        logger.info("Acquiring pooled connection to list resources...")
+        resources = await _with_db_retry(_fetch_table_resources)
+        logger.info("Found %d tables", len(resources))
+        _tables_cache = (time.monotonic(), resources)
+        return resources
     except Error as e:
         error_msg = str(e)
-        logger.error(f"Failed to list resources: {error_msg}")
+        logger.error("Failed to list resources: %s", error_msg)
         # 오류 메시지에 따라 구체적인 대응책 기록
         if "Login timeout expired" in error_msg:
             logger.error("Connection timed out - check network/firewall settings or increase timeout")
@@ -131,56 +335,46 @@ async def list_resources() -> list[Resource]:
 @app.read_resource()
 async def read_resource(uri: AnyUrl) -> str:
     """Read table contents."""
-    config, connection_string = get_db_config()
     uri_str = str(uri)
-    logger.info(f"Reading resource: {uri_str}")
+    logger.info("Reading resource: %s", uri_str)
     
-    if not uri_str.startswith("mssql://"):
+    parts = urlsplit(uri_str)
+    if parts.scheme != "mssql":
         raise ValueError(f"Invalid URI scheme: {uri_str}")
-        
-    parts = uri_str[8:].split('/')
-    table = parts[0]
-    
+    table = parts.netloc or parts.path.lstrip('/').split('/', 1)[0]
+
+    # Reject anything that is not a plain identifier before it reaches the
+    # query text; the bracket quoting below is only safe for names that
+    # cannot contain a closing bracket
+    if not _TABLE_NAME_RE.match(table):
+        raise ValueError(f"Invalid table name: {table}")
+
+    async def _read_table(conn, cursor):
+        # SQL Server는 LIMIT 대신 TOP을 사용합니다
+        await cursor.execute(f"SELECT TOP 100 * FROM [{table}]")
+        columns = [desc[0] for desc in cursor.description]
+        return await format_rows(cursor, columns)
+
     try:
-        with connect(connection_string) as conn:
-            with conn.cursor() as cursor:
-                # SQL Server는 LIMIT 대신 TOP을 사용합니다
-                cursor.execute(f"SELECT TOP 100 * FROM {table}")
-                columns = [desc[0] for desc in cursor.description]
-                rows = cursor.fetchall()
-                result = [",".join(map(str, row)) for row in rows]
-                return "\n".join([",".join(columns)] + result)
+        return await _with_db_retry(_read_table)
                 
     except Error as e:
-        logger.error(f"Database error reading resource {uri}: {str(e)}")
+        logger.error("Database error reading resource %s: %s", uri, e)
         raise RuntimeError(f"Database error: {str(e)}")
 
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available MSSQL tools."""
     logger.info("Listing tools...")
-    return [
-        Tool(
-            name="execute_sql",
-            description="Execute an SQL query on the MSSQL server",
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    "query": {
-                        "type": "string",
-                        "description": "The SQL query to execute"
-                    }
-                },
-                "required": ["query"]
-            }
-        )
-    ]
+    return _TOOLS
 
 @app.call_tool()
 async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     """Execute SQL commands."""
-    config, connection_string = get_db_config()
-    logger.info(f"Calling tool: {name} with arguments: {arguments}")
+    # Bare global read on the hot path; init_config() only runs when main()
+    # has not populated the globals yet (e.g. under tests)
+    config = _CONFIG if _CONFIG is not None else init_config()[0]
+    logger.info("Calling tool: %s with arguments: %s", name, arguments)
     
     if name != "execute_sql":
         raise ValueError(f"Unknown tool: {name}")
@@ -188,44 +382,57 @@ async def call_tool(name: str, arguments: dict) -> list[TextContent]:
     query = arguments.get("query")
     if not query:
         raise ValueError("Query is required")
-    
+
+    # Classify the query by its leading keyword; only the matched few
+    # characters are upper-cased, not the whole query string
+    match = _LEADING_KW.match(query)
+    keyword = " ".join(match.group(1).upper().split()) if match else None
+
+    async def _execute(conn, cursor):
+        # Special handling for listing tables in MSSQL; the literal
+        # SHOW TABLES is not valid T-SQL, so run only the
+        # INFORMATION_SCHEMA replacement query
+        if keyword == "SHOW TABLES":
+            await cursor.execute("SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_TYPE = 'BASE TABLE';")
+            result = [f"Tables_in_{config['database']}"]  # Header
+            result.extend(name for (name,) in await cursor.fetchall())
+            return [TextContent(type="text", text="\n".join(result))]
+
+        # Regular SELECT queries
+        elif keyword in ("SELECT", "WITH"):
+            await cursor.execute(query)
+            # A misdetected non-result statement leaves no cursor
+            # description; report that instead of raising
+            if cursor.description is None:
+                return [TextContent(type="text", text="(no result set)")]
+            columns = [desc[0] for desc in cursor.description]
+            return [TextContent(type="text", text=await format_rows(cursor, columns))]
+
+        # Non-SELECT queries
+        else:
+            await cursor.execute(query)
+            await conn.commit()
+            return [TextContent(type="text", text=_OK_FMT(cursor.rowcount))]
+
     try:
-        with connect(connection_string) as conn:
-            with conn.cursor() as cursor:
-                cursor.execute(query)
-                
-                # Special handling for listing tables in MSSQL
-                if query.strip().upper() == "SHOW TABLES":
-                    cursor.execute("SELECT TABLE_NAME FROM INFORMATION_SCHEMA.TABLES WHERE TABLE_TYPE = 'BASE TABLE';")
-                    tables = cursor.fetchall()
-                    result = [f"Tables_in_{config['database']}"]  # Header
-                    result.extend([table[0] for table in tables])
-                    return [TextContent(type="text", text="\n".join(result))]
-                
-                # Regular SELECT queries
-                elif query.strip().upper().startswith("SELECT"):
-                    columns = [desc[0] for desc in cursor.description]
-                    rows = cursor.fetchall()
-                    result = [",".join(map(str, row)) for row in rows]
-                    return [TextContent(type="text", text="\n".join([",".join(columns)] + result))]
-                
-                # Non-SELECT queries
-                else:
-                    conn.commit()
-                    return [TextContent(type="text", text=f"Query executed successfully. Rows affected: {cursor.rowcount}")]
+        return await _with_db_retry(_execute)
                 
     except Exception as e:
-        logger.error(f"Error executing SQL '{query}': {e}")
-        return [TextContent(type="text", text=f"Error executing query: {str(e)}")]
+        logger.error("Error executing SQL '%s': %s", query, e)
+        return [TextContent(type="text", text=_ERR_FMT(e))]
 
 async def main():
     """Main entry point to run the MCP server."""
     from mcp.server.stdio import stdio_server
     
     logger.info("Starting MSSQL MCP server...")
-    config, _ = get_db_config()
-    logger.info(f"Database config: {config['server']}/{config['database']} as {config['user']}")
+    config, _ = init_config()
+    logger.info("Database config: %s/%s as %s", config['server'], config['database'], config['user'])
     
+    # Warm the connection pool up-front so the first request doesn't pay
+    # the full connect cost
+    await get_pool()
+
     async with stdio_server() as (read_stream, write_stream):
         try:
             await app.run(
@@ -234,8 +441,10 @@ async def main():
                 app.create_initialization_options()
             )
         except Exception as e:
-            logger.error(f"Server error: {str(e)}", exc_info=True)
+            logger.error("Server error: %s", e, exc_info=True)
             raise
+        finally:
+            await close_pool()
 
 if __name__ == "__main__":
     asyncio.run(main())
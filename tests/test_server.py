@@ -1,7 +1,17 @@
 import pytest
-from mssql_mcp_server.server import app, list_tools, list_resources, read_resource, call_tool
+from mssql_mcp_server.server import app, list_tools, list_resources, read_resource, call_tool, _clean_env_var
 from pydantic import AnyUrl
 
+def test_clean_env_var_strips_quotes(monkeypatch):
+    """Test that surrounding quotes are stripped from environment variables."""
+    monkeypatch.setenv("MSSQL_TEST_VAR", "'quoted'")
+    assert _clean_env_var("MSSQL_TEST_VAR") == "quoted"
+    monkeypatch.setenv("MSSQL_TEST_VAR", '"double"')
+    assert _clean_env_var("MSSQL_TEST_VAR") == "double"
+    monkeypatch.setenv("MSSQL_TEST_VAR", "plain")
+    assert _clean_env_var("MSSQL_TEST_VAR") == "plain"
+    assert _clean_env_var("MSSQL_TEST_VAR_MISSING", "default") == "default"
+
 def test_server_initialization():
     """Test that the server initializes correctly."""
     assert app.name == "mssql_mcp_server"
@@ -20,6 +30,18 @@ async def test_call_tool_invalid_name():
     with pytest.raises(ValueError, match="Unknown tool"):
         await call_tool("invalid_tool", {})
 
+@pytest.mark.asyncio
+async def test_read_resource_invalid_scheme():
+    """Test reading a resource with a non-mssql URI scheme."""
+    with pytest.raises(ValueError, match="Invalid URI scheme"):
+        await read_resource(AnyUrl("http://some_table/data"))
+
+@pytest.mark.asyncio
+async def test_read_resource_invalid_table_name():
+    """Test that non-identifier table names are rejected."""
+    with pytest.raises(ValueError, match="Invalid table name"):
+        await read_resource(AnyUrl("mssql://bad-table-name/data"))
+
 @pytest.mark.asyncio
 async def test_call_tool_missing_query():
     """Test calling execute_sql without a query."""